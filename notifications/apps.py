@@ -1,6 +1,7 @@
 ''' Django notifications apps file '''
 # -*- coding: utf-8 -*-
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 from django.utils.translation import gettext_lazy as _
 
 
@@ -14,3 +15,6 @@ class Config(AppConfig):
         # this is for backwards compatibility
         import notifications.signals
         notifications.notify = notifications.signals.notify
+
+        from notifications.gfk import clear_content_type_cache
+        post_migrate.connect(clear_content_type_cache, dispatch_uid='notifications_clear_content_type_cache')
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=too-many-lines
+from collections import defaultdict
+
 from django import get_version
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
-from django.db.models.query import QuerySet
+from django.db.models.query import ModelIterable, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
@@ -15,9 +18,11 @@ from model_utils import Choices
 from packaging.version import (
     parse as parse_version,  # pylint: disable=no-name-in-module,import-error
 )
-from swapper import load_model
+from swapper import get_model_name, load_model
 
 from notifications import settings as notifications_settings
+from notifications.cache import invalidate_recipient_caches
+from notifications.gfk import get_content_type_model, get_str_fields
 from notifications.signals import notify
 from notifications.utils import id2slug
 
@@ -38,6 +43,12 @@ except ImportError:
 
 EXTRA_DATA = notifications_settings.get_config()['USE_JSONFIELD']
 
+# Names of the generic foreign keys on a notification
+GENERIC_RELATIONS = ('actor', 'target', 'action_object')
+
+# Length of the columns storing str() of the generic relations
+DISPLAY_MAX_LENGTH = 255
+
 
 def is_soft_delete():
     return notifications_settings.get_config()['SOFT_DELETE']
@@ -52,14 +63,139 @@ def assert_soft_delete():
         raise ImproperlyConfigured(msg)
 
 
+def resolve_generic_representations(references):
+    """
+    Resolve ``(content_type_id, object_id)`` pairs in bulk.
+
+    Issues one query per distinct content type, fetching only the fields
+    registered in ``notifications.gfk``, and returns a dict mapping each pair
+    to ``{'id': pk, 'type': class name, 'str': str(obj)}``. Pairs whose object
+    no longer exists are left out.
+    """
+    ids_by_content_type = defaultdict(set)
+    for content_type_id, object_id in references:
+        if content_type_id is not None and object_id is not None:
+            ids_by_content_type[content_type_id].add(object_id)
+
+    resolved = {}
+    for content_type_id, object_ids in ids_by_content_type.items():
+        model = get_content_type_model(content_type_id)
+        if model is None:
+            continue
+        # Object ids are stored as strings, map them back from the typed pk
+        to_python = model._meta.pk.to_python  # pylint: disable=protected-access
+        pks = {to_python(object_id): object_id for object_id in object_ids}
+
+        queryset = model._base_manager.filter(pk__in=list(pks))  # pylint: disable=protected-access
+        str_fields = get_str_fields(model)
+        if str_fields:
+            queryset = queryset.only(*str_fields)
+
+        type_name = model.__name__
+        for obj in queryset:
+            resolved[(content_type_id, pks[obj.pk])] = {'id': obj.pk, 'type': type_name, 'str': str(obj)}
+    return resolved
+
+
+def display_string(obj):
+    """Return ``str(obj)`` cut down to fit the ``*_display`` columns"""
+    return str(obj)[:DISPLAY_MAX_LENGTH]
+
+
+def stored_generic_representation(content_type_id, object_id, display):
+    """
+    Build the representation of a generic relation from the columns stored
+    on the notification row, without fetching the related object.
+    """
+    model = get_content_type_model(content_type_id)
+    if model is None:
+        return None
+    return {
+        'id': model._meta.pk.to_python(object_id),  # pylint: disable=protected-access
+        'type': model.__name__,
+        'str': display,
+    }
+
+
+def prefetch_generic_relations(notifications):
+    """
+    Resolve the actor, target and action object of every notification,
+    storing the representation of each as ``_prefetched_<name>``.
+
+    Relations with a stored display string are built from the row, the
+    others are fetched with one query per content type.
+    """
+    def reference(notification, name):
+        return (getattr(notification, '%s_content_type_id' % name),
+                getattr(notification, '%s_object_id' % name))
+
+    missing = []
+    for notification in notifications:
+        for name in GENERIC_RELATIONS:
+            content_type_id, object_id = reference(notification, name)
+            display = getattr(notification, '%s_display' % name)
+            if content_type_id is None or object_id is None:
+                representation = None
+            elif display:
+                representation = stored_generic_representation(content_type_id, object_id, display)
+            else:
+                missing.append((notification, name))
+                continue
+            setattr(notification, '_prefetched_%s' % name, representation)
+
+    resolved = resolve_generic_representations(
+        reference(notification, name) for notification, name in missing
+    )
+    for notification, name in missing:
+        setattr(notification, '_prefetched_%s' % name, resolved.get(reference(notification, name)))
+
+
 class NotificationQuerySet(models.query.QuerySet):
     ''' Notification QuerySet '''
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefetch_generic = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._prefetch_generic = self._prefetch_generic  # pylint: disable=protected-access
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super()._fetch_all()
+        if fetched and self._prefetch_generic and self._iterable_class is ModelIterable:
+            prefetch_generic_relations(self._result_cache)
+
+    def prefetch_generic_relations(self):
+        """Resolve actor, target and action object in bulk once the queryset is evaluated"""
+        clone = self._chain()
+        clone._prefetch_generic = True  # pylint: disable=protected-access
+        return clone
+
     def unsent(self):
         return self.filter(emailed=False)
 
     def sent(self):
         return self.filter(emailed=True)
 
+    def _update_unread_state(self, recipient=None, **kwargs):
+        """Update the current queryset and drop the cached unread counts of
+        the affected recipients, as ``update()`` sends no signals.
+
+        With ``recipient`` this is a single UPDATE query, otherwise a SELECT
+        of the distinct recipients runs first.
+        """
+        if recipient:
+            recipient_ids = [recipient.pk]
+        else:
+            recipient_ids = list(self.order_by().values_list('recipient_id', flat=True).distinct())
+
+        count = self.update(**kwargs)
+        if count:
+            invalidate_recipient_caches(recipient_ids, using=self.db)
+        return count
+
     def unread(self, include_deleted=False):
         """Return only unread items in the current queryset"""
         if is_soft_delete() and not include_deleted:
@@ -89,7 +225,7 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(unread=False)
+        return qset._update_unread_state(recipient, unread=False)  # pylint: disable=protected-access
 
     def mark_all_as_unread(self, recipient=None):
         """Mark as unread any read messages in the current queryset.
@@ -101,7 +237,7 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(unread=True)
+        return qset._update_unread_state(recipient, unread=True)  # pylint: disable=protected-access
 
     def deleted(self):
         """Return only deleted items in the current queryset"""
@@ -122,7 +258,7 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(deleted=True)
+        return qset._update_unread_state(recipient, deleted=True)  # pylint: disable=protected-access
 
     def mark_all_as_active(self, recipient=None):
         """Mark current queryset as active(un-deleted).
@@ -133,7 +269,7 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(deleted=False)
+        return qset._update_unread_state(recipient, deleted=False)  # pylint: disable=protected-access
 
     def mark_as_unsent(self, recipient=None):
         qset = self.sent()
@@ -198,6 +334,7 @@ class AbstractNotification(models.Model):
     actor_object_id = models.CharField(_('actor object id'), max_length=255)
     actor = GenericForeignKey('actor_content_type', 'actor_object_id')
     actor.short_description = _('actor')
+    actor_display = models.CharField(_('actor display'), max_length=DISPLAY_MAX_LENGTH, blank=True, default='')
 
     verb = models.CharField(_('verb'), max_length=255)
     description = models.TextField(_('description'), blank=True, null=True)
@@ -213,6 +350,7 @@ class AbstractNotification(models.Model):
     target_object_id = models.CharField(_('target object id'), max_length=255, blank=True, null=True)
     target = GenericForeignKey('target_content_type', 'target_object_id')
     target.short_description = _('target')
+    target_display = models.CharField(_('target display'), max_length=DISPLAY_MAX_LENGTH, blank=True, default='')
 
     action_object_content_type = models.ForeignKey(
         ContentType,
@@ -225,6 +363,9 @@ class AbstractNotification(models.Model):
     action_object_object_id = models.CharField(_('action object object id'), max_length=255, blank=True, null=True)
     action_object = GenericForeignKey('action_object_content_type', 'action_object_object_id')
     action_object.short_description = _('action object')
+    action_object_display = models.CharField(
+        _('action object display'), max_length=DISPLAY_MAX_LENGTH, blank=True, default=''
+    )
 
     timestamp = models.DateTimeField(_('timestamp'), default=timezone.now, db_index=True)
 
@@ -241,11 +382,24 @@ class AbstractNotification(models.Model):
         ordering = ('-timestamp',)
         # speed up notifications count query
         indexes = [
-            models.Index(fields=['recipient', 'unread']),
+            # speed up unread count and the read/unread and level filters of the API
+            models.Index(fields=['recipient', 'unread', '-timestamp']),
+            models.Index(fields=['recipient', 'level', '-timestamp']),
+            # backs the (timestamp, id) cursor pagination of the API
+            models.Index(fields=['recipient', '-timestamp', '-id']),
         ]
         verbose_name = _('Notification')
         verbose_name_plural = _('Notifications')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded recipient, so that moving a notification to
+        # another recipient also drops the cache of the previous one
+        if 'recipient_id' in field_names:
+            instance._loaded_recipient_id = instance.recipient_id  # pylint: disable=protected-access
+        return instance
+
     def __str__(self):
         ctx = {
             'actor': self.actor,
@@ -341,11 +495,16 @@ def notify_handler(verb, **kwargs):
 
     new_notifications = []
 
+    # Store str() of the related objects, so reads don't have to fetch them
+    actor_display = display_string(actor)
+    optional_displays = {opt: display_string(obj) for obj, opt in optional_objs if obj is not None}
+
     for recipient in recipients:
         newnotify = Notification(
             recipient=recipient,
             actor_content_type=ContentType.objects.get_for_model(actor, for_concrete_model=actor_for_concrete_model),
             actor_object_id=actor.pk,
+            actor_display=actor_display,
             verb=str(verb),
             public=public,
             description=description,
@@ -360,6 +519,7 @@ def notify_handler(verb, **kwargs):
                 setattr(newnotify, '%s_object_id' % opt, obj.pk)
                 setattr(newnotify, '%s_content_type' % opt,
                         ContentType.objects.get_for_model(obj, for_concrete_model=for_concrete_model))
+                setattr(newnotify, '%s_display' % opt, optional_displays[opt])
 
         if kwargs and EXTRA_DATA:
             # set kwargs as model column if available
@@ -374,5 +534,44 @@ def notify_handler(verb, **kwargs):
     return new_notifications
 
 
+def notification_saved(sender, instance, created, using, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the cached unread count and ETag of the recipient of a saved
+    notification.
+    """
+    recipient_ids = {instance.recipient_id}
+    loaded = None if created else getattr(instance, '_loaded_recipient_id', None)
+    if loaded is not None:
+        recipient_ids.add(loaded)
+    instance._loaded_recipient_id = instance.recipient_id  # pylint: disable=protected-access
+    invalidate_recipient_caches(recipient_ids, using=using)
+
+
+def notification_deleted(sender, instance, using, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the cached unread count and ETag of the recipient of a deleted
+    notification.
+    """
+    invalidate_recipient_caches([instance.recipient_id], using=using)
+
+
+def has_other_delete_receivers(model):
+    """
+    Whether receivers besides ``notification_deleted`` listen to deletes of
+    ``model``, so that deleting it without signals would skip them.
+    """
+    if pre_delete.has_listeners(model):
+        return True
+    receivers = post_delete._live_receivers(model)  # pylint: disable=protected-access
+    if isinstance(receivers, tuple):
+        # Django 5.0+ returns sync and async receivers apart
+        receivers = [receiver for group in receivers for receiver in group]
+    return any(receiver is not notification_deleted for receiver in receivers)
+
+
 # connect the signal
 notify.connect(notify_handler, dispatch_uid='notifications.models.notification')
+post_save.connect(notification_saved, sender=get_model_name('notifications', 'Notification'),
+                  dispatch_uid='notifications.models.notification_saved')
+post_delete.connect(notification_deleted, sender=get_model_name('notifications', 'Notification'),
+                    dispatch_uid='notifications.models.notification_deleted')
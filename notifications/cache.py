@@ -0,0 +1,77 @@
+''' Django notifications cache file '''
+# -*- coding: utf-8 -*-
+from functools import partial
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from notifications.settings import get_config
+
+
+def api_cache_enabled():
+    """Whether the REST API caches unread counts and ETags"""
+    config = get_config()
+    return config['USE_API_CACHE'] and config['UNREAD_COUNT_CACHE_TIMEOUT'] != 0
+
+
+def unread_count_key(recipient_id, token):
+    return f'notif:unread:{recipient_id}:{token}'
+
+
+def etag_key(recipient_id):
+    return f'notif:etag:{recipient_id}'
+
+
+def get_unread_count(recipient_id):
+    """Return the cached unread count of a recipient, or None if not cached"""
+    if not api_cache_enabled():
+        return None
+    return cache.get(unread_count_key(recipient_id, get_etag(recipient_id)))
+
+
+def cached_unread_count(recipient_id, count):
+    """Return the unread count of a recipient, calling ``count()`` and caching
+    its result on a miss.
+
+    The count is cached under the current ETag token of the recipient, read
+    before ``count()`` runs. A change committing meanwhile drops that token,
+    so a count taken before the commit is never read back.
+    """
+    if not api_cache_enabled():
+        return count()
+    key = unread_count_key(recipient_id, get_etag(recipient_id))
+    value = cache.get(key)
+    if value is None:
+        value = count()
+        cache.add(key, value, get_config()['UNREAD_COUNT_CACHE_TIMEOUT'])
+    return value
+
+
+def get_etag(recipient_id):
+    """Return an opaque token that changes whenever the notifications of a
+    recipient change.
+
+    The token is random, so a dropped or expired one can never match an ETag
+    handed out before. A cache that doesn't keep it yields a new token on
+    every call.
+    """
+    key = etag_key(recipient_id)
+    etag = cache.get(key)
+    if etag is None:
+        token = uuid4().hex
+        cache.add(key, token, get_config()['UNREAD_COUNT_CACHE_TIMEOUT'])
+        etag = cache.get(key)
+        if etag is None:
+            etag = token
+    return etag
+
+
+def invalidate_recipient_caches(recipient_ids, using=None):
+    """Drop the ETags, and with them the cached unread counts, of the given
+    recipients once the current transaction on database ``using`` commits.
+    """
+    if not api_cache_enabled():
+        return
+    keys = [etag_key(recipient_id) for recipient_id in recipient_ids]
+    transaction.on_commit(partial(cache.delete_many, keys), using=using)
@@ -0,0 +1,59 @@
+''' Django notifications generic foreign key file '''
+# -*- coding: utf-8 -*-
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.contenttypes.models import ContentType
+
+# Fields read by ``str()`` of a model, so the generic relations of
+# notifications can be resolved fetching only those columns.
+NOTIFICATION_STR_FIELDS = {}
+
+
+def register_str_fields(model, *fields):
+    """Declare the fields ``model.__str__`` reads, eg:
+
+        register_str_fields(Assignment, 'title')
+    """
+    NOTIFICATION_STR_FIELDS[model] = tuple(fields)
+
+
+def get_str_fields(model):
+    """Return the fields ``str()`` needs for instances of ``model``.
+
+    An empty tuple means the whole row has to be fetched.
+    """
+    try:
+        return NOTIFICATION_STR_FIELDS[model]
+    except KeyError:
+        pass
+    # Users that keep the stock __str__ only need their username
+    if issubclass(model, AbstractBaseUser) and model.__str__ is AbstractBaseUser.__str__:
+        return (model.USERNAME_FIELD,)
+    return ()
+
+
+# Model class of every content type id, snapshotted on first use. Content
+# types only change with migrations, which clear it through ``post_migrate``.
+CT_CACHE = {}
+
+
+def get_content_type_model(content_type_id):
+    """Return the model class of a content type id, or None if it is stale.
+
+    Raises ``ContentType.DoesNotExist`` for unknown ids.
+    """
+    try:
+        return CT_CACHE[content_type_id]
+    except KeyError:
+        pass
+    if not CT_CACHE:
+        CT_CACHE.update((ct.pk, ct.model_class()) for ct in ContentType.objects.all())
+        if content_type_id in CT_CACHE:
+            return CT_CACHE[content_type_id]
+    # Created after the snapshot was taken
+    model = CT_CACHE[content_type_id] = ContentType.objects.get_for_id(content_type_id).model_class()
+    return model
+
+
+def clear_content_type_cache(**kwargs):  # pylint: disable=unused-argument
+    """Drop the content type snapshot, connected to ``post_migrate``"""
+    CT_CACHE.clear()
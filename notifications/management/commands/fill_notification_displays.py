@@ -0,0 +1,56 @@
+''' Django notifications fill_notification_displays command '''
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from swapper import load_model
+
+from notifications.base.models import DISPLAY_MAX_LENGTH, GENERIC_RELATIONS, resolve_generic_representations
+
+Notification = load_model('notifications', 'Notification')
+
+
+class Command(BaseCommand):
+    help = ('Store str() of the actor, target and action object of notifications '
+            'sent before the *_display columns existed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Notifications read and updated at a time.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['%s_display' % name for name in GENERIC_RELATIONS]
+        missing = Q()
+        for name in GENERIC_RELATIONS:
+            missing |= Q(**{'%s_display' % name: '', '%s_content_type__isnull' % name: False})
+        notifications = Notification.objects.filter(missing).order_by('pk').only(
+            *fields,
+            *('%s_content_type_id' % name for name in GENERIC_RELATIONS),
+            *('%s_object_id' % name for name in GENERIC_RELATIONS),
+        )
+
+        filled = 0
+        batch = list(notifications[:batch_size])
+        while batch:
+            filled += self.fill(batch, fields)
+            batch = list(notifications.filter(pk__gt=batch[-1].pk)[:batch_size])
+        self.stdout.write('Filled the displays of %d notifications.' % filled)
+
+    def fill(self, notifications, fields):
+        def reference(notification, name):
+            return (getattr(notification, '%s_content_type_id' % name),
+                    getattr(notification, '%s_object_id' % name))
+
+        resolved = resolve_generic_representations(
+            reference(notification, name) for notification in notifications for name in GENERIC_RELATIONS
+            if not getattr(notification, '%s_display' % name)
+        )
+        changed = {}
+        for notification in notifications:
+            for name in GENERIC_RELATIONS:
+                representation = resolved.get(reference(notification, name))
+                if representation is not None and not getattr(notification, '%s_display' % name):
+                    setattr(notification, '%s_display' % name, representation['str'][:DISPLAY_MAX_LENGTH])
+                    changed[notification.pk] = notification
+        Notification.objects.bulk_update(changed.values(), fields)
+        return len(changed)
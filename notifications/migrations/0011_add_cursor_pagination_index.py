@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-14 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0010_rename_notification_recipient_unread_notificatio_recipie_8bedf2_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-timestamp", "-id"],
+                name="notificatio_recipie_f6c878_idx",
+            ),
+        ),
+    ]
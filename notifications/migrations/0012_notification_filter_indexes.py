@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-14 09:03
+
+from django.db import migrations, models
+
+VERB_TRIGRAM_INDEX = "notif_verb_trgm"
+
+
+def create_verb_trigram_index(apps, schema_editor):
+    """
+    Back the ``verb__icontains`` filter with a trigram index on PostgreSQL.
+    Django compiles ``icontains`` to ``UPPER(verb::text) LIKE UPPER(...)``,
+    so the index is built on that expression.
+
+    Installing pg_trgm needs privileges the migrating role may lack, so the
+    index is only built when the extension is already there.
+    """
+    Notification = apps.get_model("notifications", "Notification")
+    if schema_editor.connection.vendor != "postgresql" or Notification._meta.swapped:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS %s ON %s USING GIN ((UPPER(%s::text)) gin_trgm_ops)" % (
+            schema_editor.quote_name(VERB_TRIGRAM_INDEX),
+            schema_editor.quote_name(Notification._meta.db_table),
+            schema_editor.quote_name(Notification._meta.get_field("verb").column),
+        )
+    )
+
+
+def drop_verb_trigram_index(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    if schema_editor.connection.vendor != "postgresql" or Notification._meta.swapped:
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS %s" % schema_editor.quote_name(VERB_TRIGRAM_INDEX))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0011_add_cursor_pagination_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "unread", "-timestamp"],
+                name="notificatio_recipie_60f711_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "level", "-timestamp"],
+                name="notificatio_recipie_a89ffe_idx",
+            ),
+        ),
+        # (recipient, unread) is a prefix of the index above
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="notificatio_recipie_8bedf2_idx",
+        ),
+        migrations.RunPython(create_verb_trigram_index, drop_verb_trigram_index),
+    ]
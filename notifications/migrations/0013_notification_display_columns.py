@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-14 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0012_notification_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="action_object_display",
+            field=models.CharField(blank=True, default="", max_length=255, verbose_name="action object display"),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="actor_display",
+            field=models.CharField(blank=True, default="", max_length=255, verbose_name="actor display"),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="target_display",
+            field=models.CharField(blank=True, default="", max_length=255, verbose_name="target display"),
+        ),
+    ]
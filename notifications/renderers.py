@@ -0,0 +1,39 @@
+''' Django notifications renderers file '''
+# -*- coding: utf-8 -*-
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None  # pylint: disable=invalid-name
+
+_encoder = JSONEncoder()  # pylint: disable=invalid-name
+
+
+def dumps(data):
+    """Encode ``data`` as compact UTF-8 JSON bytes, with orjson if installed.
+
+    Types orjson doesn't know (lazy translations, Decimal, ...) are handled
+    by DRF's JSONEncoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+    Indented output (eg for the browsable API) and installs without orjson
+    use the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return dumps(data)
@@ -1,7 +1,33 @@
+from copy import deepcopy
+
 from rest_framework import serializers
 from django.contrib.contenttypes.models import ContentType
+from .base.models import stored_generic_representation
 from .models import Notification
 
+# Most notifications a single bulk action can touch
+MAX_BULK_ACTION_IDS = 500
+
+
+class CachedFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that builds its fields only once per serializer class.
+
+    ``ModelSerializer.get_fields()`` introspects the model and constructs every
+    field on each instantiation, which dominates the cost of rendering list
+    pages. The constructed fields are cached per class (and per ``fields``
+    kwarg, for subclasses that support dynamic field selection) and each
+    instance gets deep copies, like DRF does for declared fields, so that
+    validators or error messages changed on one instance stay on it.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        key = (type(self), frozenset(self._kwargs.get('fields', ())))
+        if key not in self._fields_cache:
+            self._fields_cache[key] = super().get_fields()
+        return deepcopy(self._fields_cache[key])
+
 
 class GenericRelatedField(serializers.RelatedField):
     """
@@ -9,9 +35,27 @@ class GenericRelatedField(serializers.RelatedField):
     Returns a dictionary with the object's string representation and type.
     """
 
+    def get_attribute(self, instance):
+        # Prefer the representation resolved by NotificationQuerySet.prefetch_generic_relations(),
+        # then the one stored on the row, over the generic foreign key descriptor, which queries per row.
+        try:
+            return getattr(instance, '_prefetched_%s' % self.source)
+        except AttributeError:
+            pass
+        display = getattr(instance, '%s_display' % self.source, '')
+        content_type_id = getattr(instance, '%s_content_type_id' % self.source, None)
+        if display and content_type_id is not None:
+            return stored_generic_representation(
+                content_type_id, getattr(instance, '%s_object_id' % self.source), display
+            )
+        return super().get_attribute(instance)
+
     def to_representation(self, value):
         if value is None:
             return None
+        if isinstance(value, dict):
+            # Already resolved by prefetch_generic_relations()
+            return value
         return {
             'id': value.pk,
             'type': value.__class__.__name__,
@@ -19,7 +63,7 @@ class GenericRelatedField(serializers.RelatedField):
         }
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(CachedFieldsModelSerializer):
     """
     Serializer for Notification model with all relevant fields for API consumption.
     """
@@ -63,11 +107,11 @@ class NotificationSerializer(serializers.ModelSerializer):
         ]
 
 
-class NotificationListSerializer(serializers.ModelSerializer):
+class NotificationListSerializer(CachedFieldsModelSerializer):
     """
     Lightweight serializer for listing notifications (less detailed).
     """
-    actor_str = serializers.CharField(source='actor.__str__', read_only=True)
+    actor_str = serializers.SerializerMethodField()
     time_since = serializers.CharField(source='timesince', read_only=True)
 
     class Meta:
@@ -82,6 +126,17 @@ class NotificationListSerializer(serializers.ModelSerializer):
             'time_since',
         ]
 
+    def get_actor_str(self, obj):
+        try:
+            # Resolved in bulk by prefetch_generic_relations()
+            actor = obj._prefetched_actor  # pylint: disable=protected-access
+        except AttributeError:
+            if obj.actor_display:
+                return obj.actor_display
+            actor = obj.actor
+            return str(actor) if actor is not None else None
+        return actor['str'] if actor is not None else None
+
 
 class UnreadCountSerializer(serializers.Serializer):
     """
@@ -111,10 +166,16 @@ class BulkActionSerializer(serializers.Serializer):
     Serializer for bulk actions on multiple notifications.
     """
     notification_ids = serializers.ListField(
-        child=serializers.IntegerField(),
-        allow_empty=False
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BULK_ACTION_IDS
     )
     action = serializers.ChoiceField(
         choices=['mark_read', 'mark_unread', 'delete'],
         required=True
-    )
\ No newline at end of file
+    )
+
+    def validate_notification_ids(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError('Duplicate notification ids.')
+        return value
\ No newline at end of file
@@ -9,6 +9,8 @@ CONFIG_DEFAULTS = {
     'SOFT_DELETE': False,
     'NUM_TO_FETCH': 10,
     'CACHE_TIMEOUT': 2,
+    'USE_API_CACHE': False,
+    'UNREAD_COUNT_CACHE_TIMEOUT': 300,
 }
 
 
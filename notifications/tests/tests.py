@@ -0,0 +1,357 @@
+''' Django notifications tests file '''
+# -*- coding: utf-8 -*-
+from io import StringIO
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.test import TestCase, override_settings
+from django.urls import resolve
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.test import APIClient
+
+from notifications.cache import cached_unread_count, get_etag, get_unread_count
+from notifications.models import Notification
+from notifications.renderers import OrjsonRenderer
+from notifications.serializers import NotificationSerializer
+from notifications.signals import notify
+from notifications.views import NotificationViewSet, UnreadRedirectView
+
+
+class CachedFieldsTest(TestCase):
+    ''' Serializer instances don't share the state of their cached fields '''
+
+    def test_field_state_is_per_instance(self):
+        first, second = NotificationSerializer(), NotificationSerializer()
+        self.assertIsNot(first.fields['verb'], second.fields['verb'])
+        self.assertIsNot(first.fields['verb'].validators, second.fields['verb'].validators)
+        self.assertIsNot(first.fields['verb'].error_messages, second.fields['verb'].error_messages)
+
+    def test_validators_added_in_init_do_not_leak(self):
+        class ExtraValidatorSerializer(NotificationSerializer):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.fields['verb'].validators.append(lambda value: None)
+
+        counts = {len(ExtraValidatorSerializer().fields['verb'].validators) for _ in range(3)}
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(
+            len(NotificationSerializer().fields['verb'].validators) + 1, counts.pop()
+        )
+
+
+class UnreadCountCacheTest(TestCase):
+    ''' The cached unread count follows committed changes only '''
+
+    def setUp(self):
+        cache.clear()
+        self.recipient = User.objects.create(username='recipient')
+        self.actor = User.objects.create(username='actor')
+        notify.send(self.actor, recipient=self.recipient, verb='commented')
+        cached_unread_count(self.recipient.pk, lambda: 1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.recipient)
+
+    def notify(self):
+        return notify.send(self.actor, recipient=self.recipient, verb='liked')[0][1][0]
+
+    def unread_count(self):
+        return self.client.get('/api/notifications/unread_count/').json()['unread_count']
+
+    def test_created_notification_drops_count_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify()
+            self.assertEqual(get_unread_count(self.recipient.pk), 1)
+        self.assertIsNone(get_unread_count(self.recipient.pk))
+        self.assertEqual(self.unread_count(), 2)
+
+    def test_rolled_back_notification_keeps_count(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.notify()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(get_unread_count(self.recipient.pk), 1)
+        self.assertEqual(Notification.objects.unread().count(), 1)
+
+    def test_count_taken_before_concurrent_commit_is_not_kept(self):
+        def stale_count():
+            # Another request commits a notification while this one counts
+            count = Notification.objects.unread().count()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.notify()
+            return count
+
+        cache.clear()
+        self.assertEqual(cached_unread_count(self.recipient.pk, stale_count), 1)
+        self.assertIsNone(get_unread_count(self.recipient.pk))
+        self.assertEqual(self.unread_count(), 2)
+
+    def test_deleted_notification_drops_count(self):
+        notification = Notification.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.delete()
+        self.assertIsNone(get_unread_count(self.recipient.pk))
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_mark_as_read_drops_count(self):
+        notification = Notification.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.mark_as_read()
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_mark_all_as_read_drops_count(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.mark_all_as_read()
+        self.assertIsNone(get_unread_count(self.recipient.pk))
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_mark_read_action_drops_count(self):
+        notification = Notification.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/notifications/{notification.pk}/mark_read/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_bulk_delete_drops_count(self):
+        notification = Notification.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/notifications/bulk_action/',
+                {'notification_ids': [notification.pk], 'action': 'delete'},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(get_unread_count(self.recipient.pk))
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_moved_notification_drops_both_counts(self):
+        other = User.objects.create(username='other')
+        cached_unread_count(other.pk, lambda: 0)
+        notification = Notification.objects.get()
+        notification.recipient = other
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.save()
+        self.assertIsNone(get_unread_count(self.recipient.pk))
+        self.assertIsNone(get_unread_count(other.pk))
+
+
+class EtagCacheTest(TestCase):
+    ''' The ETag changes once a change commits, never before '''
+
+    def setUp(self):
+        cache.clear()
+        self.recipient = User.objects.create(username='recipient')
+        self.actor = User.objects.create(username='actor')
+
+    def test_token_issued_during_transaction_is_dropped_on_commit(self):
+        before = get_etag(self.recipient.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify.send(self.actor, recipient=self.recipient, verb='liked')
+            self.assertEqual(get_etag(self.recipient.pk), before)
+        self.assertNotEqual(get_etag(self.recipient.pk), before)
+
+    def test_rolled_back_change_keeps_token(self):
+        before = get_etag(self.recipient.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    notify.send(self.actor, recipient=self.recipient, verb='liked')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(get_etag(self.recipient.pk), before)
+
+    def test_list_is_not_modified_until_change(self):
+        client = APIClient()
+        client.force_authenticate(self.recipient)
+        etag = client.get('/api/notifications/')['ETag']
+        response = client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify.send(self.actor, recipient=self.recipient, verb='liked')
+        response = client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ApiCacheOffTest(TestCase):
+    ''' Without a cache that keeps entries, every poll is answered afresh '''
+
+    def setUp(self):
+        self.recipient = User.objects.create(username='recipient')
+        self.actor = User.objects.create(username='actor')
+        self.client = APIClient()
+        self.client.force_authenticate(self.recipient)
+
+    def assert_changes_are_seen(self, url):
+        etag = self.client.get(url).get('ETag')
+        notify.send(self.actor, recipient=self.recipient, verb='liked')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag or '*')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    @override_settings(DJANGO_NOTIFICATIONS_CONFIG={'USE_API_CACHE': False})
+    def test_disabled(self):
+        self.assertNotIn('ETag', self.client.get('/api/notifications/'))
+        response = self.assert_changes_are_seen('/api/notifications/unread_count/')
+        self.assertEqual(response.json(), {'unread_count': 1})
+
+    @override_settings(DJANGO_NOTIFICATIONS_CONFIG={'USE_API_CACHE': True, 'UNREAD_COUNT_CACHE_TIMEOUT': 0})
+    def test_zero_timeout(self):
+        self.assertNotIn('ETag', self.client.get('/api/notifications/'))
+        self.assert_changes_are_seen('/api/notifications/')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_dummy_cache(self):
+        self.assertNotEqual(get_etag(self.recipient.pk), get_etag(self.recipient.pk))
+        self.assert_changes_are_seen('/api/notifications/')
+        response = self.assert_changes_are_seen('/api/notifications/unread_count/')
+        self.assertEqual(response.json(), {'unread_count': 2})
+
+
+class BulkActionTest(TestCase):
+    ''' bulk_action only touches notifications matching the list filters '''
+
+    def setUp(self):
+        self.recipient = User.objects.create(username='recipient')
+        self.actor = User.objects.create(username='actor')
+        self.notification = notify.send(self.actor, recipient=self.recipient, verb='commented')[0][1][0]
+        self.notification.mark_as_read()
+        self.client = APIClient()
+        self.client.force_authenticate(self.recipient)
+
+    def test_delete_honours_unread_only(self):
+        response = self.client.post(
+            '/api/notifications/bulk_action/?unread_only=true',
+            {'notification_ids': [self.notification.pk], 'action': 'delete'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Notification.objects.filter(pk=self.notification.pk).exists())
+
+    def test_delete_sends_signals_to_other_receivers(self):
+        for signal in (pre_delete, post_delete):
+            deleted = []
+
+            def receiver(sender, instance, **kwargs):  # pylint: disable=unused-argument
+                deleted.append(instance.pk)
+
+            signal.connect(receiver, sender=Notification)
+            try:
+                notification = notify.send(self.actor, recipient=self.recipient, verb='liked')[0][1][0]
+                response = self.client.post(
+                    '/api/notifications/bulk_action/',
+                    {'notification_ids': [notification.pk], 'action': 'delete'},
+                    format='json',
+                )
+            finally:
+                signal.disconnect(receiver, sender=Notification)
+            self.assertEqual(response.json()['affected_count'], 1)
+            self.assertEqual(deleted, [notification.pk])
+
+    def test_delete_ignores_other_recipients(self):
+        other = User.objects.create(username='other')
+        self.client.force_authenticate(other)
+        response = self.client.post(
+            '/api/notifications/bulk_action/',
+            {'notification_ids': [self.notification.pk], 'action': 'delete'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Notification.objects.filter(pk=self.notification.pk).exists())
+
+
+class FillNotificationDisplaysTest(TestCase):
+    ''' fill_notification_displays stores the displays left empty '''
+
+    def test_fills_empty_displays(self):
+        recipient = User.objects.create(username='recipient')
+        actor = User.objects.create(username='actor')
+        notification = Notification.objects.create(recipient=recipient, actor=actor, verb='liked')
+        self.assertEqual(notification.actor_display, '')
+
+        call_command('fill_notification_displays', stdout=StringIO())
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.actor_display, 'actor')
+        self.assertEqual(notification.target_display, '')
+
+
+class LevelsTest(TestCase):
+    ''' levels lists every Notification.LEVELS value, cacheable for a day '''
+
+    def test_levels(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='recipient'))
+        response = client.get('/api/notifications/levels/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'levels': [
+            {'value': 'success', 'label': 'Success'},
+            {'value': 'info', 'label': 'Info'},
+            {'value': 'warning', 'label': 'Warning'},
+            {'value': 'error', 'label': 'Error'},
+        ]})
+        cache_control = {part.strip() for part in response['Cache-Control'].split(',')}
+        self.assertEqual(cache_control, {'public', 'max-age=86400'})
+
+
+class RenderersTest(TestCase):
+    ''' Only the stock JSONRenderer is swapped for orjson '''
+
+    def renderers(self, *renderer_classes):
+        viewset = type('ViewSet', (NotificationViewSet,), {'renderer_classes': list(renderer_classes)})
+        return [type(renderer) for renderer in viewset().get_renderers()]
+
+    def test_stock_renderer_is_replaced(self):
+        self.assertEqual(
+            self.renderers(JSONRenderer, BrowsableAPIRenderer),
+            [OrjsonRenderer, BrowsableAPIRenderer],
+        )
+
+    def test_json_renderer_subclass_is_kept(self):
+        class CamelCaseJSONRenderer(JSONRenderer):
+            pass
+
+        self.assertEqual(self.renderers(CamelCaseJSONRenderer), [CamelCaseJSONRenderer])
+
+
+class UnreadRedirectTest(TestCase):
+    ''' The former unread action redirects to the filtered list '''
+
+    def setUp(self):
+        recipient = User.objects.create(username='recipient')
+        for verb in ('liked', 'commented'):
+            notify.send(recipient, recipient=recipient, verb=verb)
+        self.client = APIClient()
+        self.client.force_authenticate(recipient)
+
+    def test_route_wins_over_detail_route(self):
+        self.assertIs(resolve('/api/notifications/unread/').func.view_class, UnreadRedirectView)
+
+    def test_redirect_keeps_query_parameters(self):
+        cursor = parse_qs(urlsplit(
+            self.client.get('/api/notifications/?page_size=1').json()['next']
+        ).query)['cursor'][0]
+        response = self.client.get(
+            '/api/notifications/unread/', {'cursor': cursor, 'page_size': 1, 'unread_only': 'false'}
+        )
+        self.assertEqual(response.status_code, 301)
+        location = urlsplit(response['Location'])
+        self.assertEqual(location.path, '/api/notifications/')
+        self.assertEqual(
+            parse_qs(location.query),
+            {'cursor': [cursor], 'page_size': ['1'], 'unread_only': ['true']},
+        )
+        followed = self.client.get(response['Location'])
+        self.assertEqual([item['verb'] for item in followed.json()['results']], ['liked'])
+
+    @override_settings(ROOT_URLCONF='notifications.tests.urls')
+    def test_redirect_keeps_url_prefix(self):
+        response = self.client.get('/v1/api/notifications/unread/')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], '/v1/api/notifications/?unread_only=true')
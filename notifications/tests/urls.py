@@ -0,0 +1,7 @@
+''' Django notifications urls for tests '''
+# -*- coding: utf-8 -*-
+from django.urls import include, path
+
+urlpatterns = [
+    path('v1/', include('notifications.urls')),
+]
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .viewsets import NotificationViewSet
+from .views import NotificationViewSet, UnreadRedirectView
 
 # Create router and register viewsets
 router = DefaultRouter()
@@ -8,6 +8,8 @@ router.register(r'notifications', NotificationViewSet, basename='notification')
 
 # URL patterns
 urlpatterns = [
+    # Former unread action, must come before the router's detail route
+    path('api/notifications/unread/', UnreadRedirectView.as_view(), name='notification-unread'),
     # API endpoints
     path('api/', include(router.urls)),
 ]
@@ -19,7 +21,7 @@ urlpatterns = [
 # DELETE /api/notifications/{id}/               - Delete notification
 #
 # Custom actions:
-# GET    /api/notifications/unread/             - List unread notifications
+# GET    /api/notifications/unread/             - Redirects (301) to ?unread_only=true
 # GET    /api/notifications/unread_count/       - Get unread count
 # POST   /api/notifications/{id}/mark_read/     - Mark specific as read
 # POST   /api/notifications/{id}/mark_unread/   - Mark specific as unread
@@ -32,4 +34,4 @@ urlpatterns = [
 # ?unread_only=true/false  - Filter by read status
 # ?level=info/success/warning/error  - Filter by level
 # ?verb=liked  - Filter by verb (contains)
-# ?page=1&page_size=20  - Pagination
\ No newline at end of file
+# ?cursor=<cursor>&page_size=20  - Pagination (follow the next/previous links)
\ No newline at end of file
@@ -1,26 +1,89 @@
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+from django.core.exceptions import ValidationError
+from django.db import router
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
-
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.views.generic import RedirectView
+from django.utils.timesince import timesince
+
+from .base.models import has_other_delete_receivers, resolve_generic_representations
+from .cache import api_cache_enabled, cached_unread_count, get_etag, invalidate_recipient_caches
 from .models import Notification
+from .renderers import OrjsonRenderer
 from .serializers import (
     NotificationSerializer,
     NotificationListSerializer,
     UnreadCountSerializer,
     MarkAllAsReadSerializer,
-    MarkAsReadSerializer,
     BulkActionSerializer
 )
 
 
-class NotificationPagination(PageNumberPagination):
+# Columns needed to build the list representation without a serializer
+LIST_VALUES = (
+    'id',
+    'verb',
+    'level',
+    'unread',
+    'timestamp',
+    'actor_content_type_id',
+    'actor_object_id',
+    'actor_display',
+)
+
+# Query parameters that narrow down get_queryset()
+FILTER_PARAMS = ('unread_only', 'level', 'verb')
+
+# Actions that serialize model instances and need the related rows
+SERIALIZING_ACTIONS = frozenset(('retrieve', 'update', 'partial_update'))
+
+# Accepted values of the unread_only query parameter
+TRUTHY = frozenset(('true', '1', 'yes'))
+FALSY = frozenset(('false', '0', 'no'))
+
+# Formats timestamps exactly like the serializers do
+_timestamp_field = serializers.DateTimeField()
+
+# Constant bodies of the mark_read/mark_unread responses (see MarkAsReadSerializer)
+_READ_OK = {'success': True, 'message': 'Notification marked as read'}
+_UNREAD_OK = {'success': True, 'message': 'Notification marked as unread'}
+
+# Notification.LEVELS is constant, so the levels response is built only once
+_LEVELS_RESPONSE = {
+    'levels': [{'value': value, 'label': value.title()} for value, _ in Notification.LEVELS]
+}
+
+
+def _notifications_etag(request, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    ETag of the current user's notifications, taken from the cache so that
+    unchanged polls are answered with a 304 before any query or serialization.
+    The token ignores the passing of time, so ``time_since`` in a list body
+    answered with a 304 can be up to UNREAD_COUNT_CACHE_TIMEOUT seconds old.
+    Returns None, so no ETag is sent, while the API cache is off.
+    """
+    if not api_cache_enabled():
+        return None
+    return f'{get_etag(request.user.pk)}-{request.accepted_renderer.format}'
+
+
+class NotificationPagination(CursorPagination):
     """
     Custom pagination for notifications.
+    DRF cursors only encode the timestamp of the last item plus an offset
+    among items sharing it, so pages seek on timestamp instead of using an
+    OFFSET over the whole list. ``-id`` keeps the order stable.
     """
+    ordering = ('-timestamp', '-id')
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -34,6 +97,16 @@ class NotificationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = NotificationPagination
 
+    def get_renderers(self):
+        """
+        Render with orjson in place of the stock JSONRenderer. Other renderers,
+        including project JSONRenderer subclasses, are kept as they are.
+        """
+        return [
+            OrjsonRenderer() if renderer is JSONRenderer else renderer()
+            for renderer in self.renderer_classes
+        ]
+
     def get_serializer_class(self):
         """
         Return appropriate serializer based on action.
@@ -43,60 +116,106 @@ class NotificationViewSet(viewsets.ModelViewSet):
         return NotificationSerializer
 
     def get_queryset(self):
+        """
+        Return notifications for the authenticated user only, joining the
+        related rows only for the actions that serialize instances.
+        """
+        queryset = self._base_queryset()
+        if self.action in SERIALIZING_ACTIONS:
+            queryset = queryset.select_related('recipient').prefetch_generic_relations()
+        return queryset
+
+    def _base_queryset(self):
         """
         Return notifications for the authenticated user only.
         Supports filtering by read/unread status and level.
         """
+        query_params = self.request.query_params
         queryset = self.request.user.notifications.all()
 
         # Filter by read/unread status
-        unread_only = self.request.query_params.get('unread_only', None)
-        if unread_only is not None:
-            if unread_only.lower() in ['true', '1']:
+        unread_only = query_params.get('unread_only')
+        if unread_only:
+            unread_only = unread_only.lower()
+            if unread_only in TRUTHY:
                 queryset = queryset.unread()
-            elif unread_only.lower() in ['false', '0']:
+            elif unread_only in FALSY:
                 queryset = queryset.read()
 
         # Filter by level
-        level = self.request.query_params.get('level', None)
+        level = query_params.get('level')
         if level:
             queryset = queryset.filter(level=level)
 
         # Filter by verb (notification type)
-        verb = self.request.query_params.get('verb', None)
+        verb = query_params.get('verb')
         if verb:
             queryset = queryset.filter(verb__icontains=verb)
 
-        return queryset.select_related('recipient').prefetch_related(
-            'actor_content_type',
-            'target_content_type',
-            'action_object_content_type'
+        return queryset
+
+    def _fast_list_representation(self, queryset):
+        """
+        Build the NotificationListSerializer representation straight from
+        ``values()`` rows, skipping the per-field serializer machinery.
+        """
+        rows = list(queryset)
+        # Only rows created before actor_display was stored need a lookup
+        actors = resolve_generic_representations(
+            (row['actor_content_type_id'], row['actor_object_id']) for row in rows if not row['actor_display']
         )
+        data = []
+        for row in rows:
+            actor_str = row['actor_display']
+            if not actor_str:
+                actor = actors.get((row['actor_content_type_id'], row['actor_object_id']))
+                actor_str = actor['str'] if actor is not None else None
+            data.append({
+                'id': row['id'],
+                'actor_str': actor_str,
+                'verb': row['verb'],
+                'level': row['level'],
+                'unread': row['unread'],
+                'timestamp': _timestamp_field.to_representation(row['timestamp']),
+                'time_since': timesince(row['timestamp']),
+            })
+        return data
+
+    def _fast_list_response(self, queryset):
+        """
+        Paginate ``queryset`` as ``values()`` rows and render them with
+        ``_fast_list_representation``.
+        """
+        rows = queryset.values(*LIST_VALUES)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self._fast_list_representation(page))
+
+        # Only reached if a subclass disables pagination
+        return Response(self._fast_list_representation(rows))
+
+    @method_decorator(condition(etag_func=_notifications_etag))
+    def list(self, request, *args, **kwargs):
+        """
+        List notifications for the current user.
+        GET /api/notifications/
+        """
+        return self._fast_list_response(self.filter_queryset(self.get_queryset()))
 
     def perform_destroy(self, instance):
         """
-        Override destroy to ensure users can only delete their own notifications.
+        Delete the notification, get_queryset() already limits
+        ``instance`` to the user's own notifications.
         """
-        if instance.recipient != self.request.user:
-            return Response(
-                {'error': 'You can only delete your own notifications'},
-                status=status.HTTP_403_FORBIDDEN
-            )
         instance.delete()
 
     def partial_update(self, request, pk=None):
         """
         Handle PATCH requests - mainly for marking as read/unread.
         """
+        # get_queryset() only contains the user's own notifications
         notification = self.get_object()
 
-        # Check ownership
-        if notification.recipient != request.user:
-            return Response(
-                {'error': 'You can only modify your own notifications'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-
         # Handle unread field specifically
         if 'unread' in request.data:
             if request.data['unread']:
@@ -111,51 +230,49 @@ class NotificationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
-    def unread(self, request):
-        """
-        Get all unread notifications for the current user.
-        GET /api/notifications/unread/
-        """
-        unread_notifications = self.get_queryset().unread()
-        page = self.paginate_queryset(unread_notifications)
-
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(unread_notifications, many=True)
-        return Response(serializer.data)
-
-    @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=_notifications_etag))
     def unread_count(self, request):
         """
         Get count of unread notifications.
         GET /api/notifications/unread_count/
         """
-        count = self.get_queryset().unread().count()
+        query_params = request.query_params
+        unread = self._base_queryset().unread()
+        if any(query_params.get(param) for param in FILTER_PARAMS):
+            count = unread.count()
+        else:
+            # Only the unfiltered count is cached, it is dropped on changes
+            count = cached_unread_count(request.user.pk, unread.count)
+
         serializer = UnreadCountSerializer({'unread_count': count})
         return Response(serializer.data)
 
+    def _set_unread(self, pk, unread):
+        """
+        Set the unread flag of one of the user's notifications with a single
+        scoped UPDATE, falling back to an existence check only when nothing
+        changed. Raises NotFound if the user has no such notification.
+        """
+        user = self.request.user
+        try:
+            notifications = user.notifications.filter(pk=pk)
+            updated = notifications.filter(unread=not unread).update(unread=unread)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound()  # pylint: disable=raise-missing-from
+
+        if updated:
+            invalidate_recipient_caches([user.pk], using=notifications.db)
+        elif not notifications.exists():
+            raise NotFound()
+
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         """
         Mark a specific notification as read.
         POST /api/notifications/{id}/mark_read/
         """
-        notification = self.get_object()
-
-        if notification.recipient != request.user:
-            return Response(
-                {'error': 'You can only modify your own notifications'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-
-        notification.mark_as_read()
-        serializer = MarkAsReadSerializer({
-            'success': True,
-            'message': 'Notification marked as read'
-        })
-        return Response(serializer.data)
+        self._set_unread(pk, False)
+        return Response(_READ_OK)
 
     @action(detail=True, methods=['post'])
     def mark_unread(self, request, pk=None):
@@ -163,20 +280,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
         Mark a specific notification as unread.
         POST /api/notifications/{id}/mark_unread/
         """
-        notification = self.get_object()
-
-        if notification.recipient != request.user:
-            return Response(
-                {'error': 'You can only modify your own notifications'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-
-        notification.mark_as_unread()
-        serializer = MarkAsReadSerializer({
-            'success': True,
-            'message': 'Notification marked as unread'
-        })
-        return Response(serializer.data)
+        self._set_unread(pk, True)
+        return Response(_UNREAD_OK)
 
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
@@ -206,6 +311,31 @@ class NotificationViewSet(viewsets.ModelViewSet):
         })
         return Response(serializer.data)
 
+    def _bulk_delete(self, notification_ids):
+        """
+        Delete the given notifications of the current user and return how
+        many were deleted.
+        Deletes straight from the filtered queryset, bypassing the deletion
+        collector and its signals, so the cached unread count is dropped here.
+        Falls back to ``delete()`` when anything else needs those.
+        """
+        queryset = self.get_queryset().filter(id__in=notification_ids)
+        model = queryset.model
+
+        if model._meta.related_objects or has_other_delete_receivers(model):
+            # Rows referencing notifications and delete receivers of other
+            # apps need the deletion collector
+            _, deleted = queryset.delete()
+            return deleted.get(model._meta.label, 0)
+
+        # BulkActionSerializer caps the ids at MAX_BULK_ACTION_IDS, few enough
+        # for a single DELETE statement
+        using = router.db_for_write(model)
+        count = queryset._raw_delete(using)  # pylint: disable=protected-access
+
+        invalidate_recipient_caches([self.request.user.pk], using=using)
+        return count
+
     @action(detail=False, methods=['post'])
     def bulk_action(self, request):
         """
@@ -227,12 +357,6 @@ class NotificationViewSet(viewsets.ModelViewSet):
         # Get notifications that belong to the user
         notifications = self.get_queryset().filter(id__in=notification_ids)
 
-        if not notifications.exists():
-            return Response(
-                {'error': 'No valid notifications found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-
         # Perform the action
         if action_type == 'mark_read':
             count = notifications.update(unread=False)
@@ -241,10 +365,18 @@ class NotificationViewSet(viewsets.ModelViewSet):
             count = notifications.update(unread=True)
             message = f'{count} notifications marked as unread'
         elif action_type == 'delete':
-            count = notifications.count()
-            notifications.delete()
+            count = self._bulk_delete(notification_ids)
             message = f'{count} notifications deleted'
 
+        if not count:
+            return Response(
+                {'error': 'No valid notifications found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if action_type != 'delete':
+            invalidate_recipient_caches([request.user.pk], using=notifications.db)
+
         return Response({
             'success': True,
             'message': message,
@@ -257,5 +389,21 @@ class NotificationViewSet(viewsets.ModelViewSet):
         Get available notification levels.
         GET /api/notifications/levels/
         """
-        levels = [{'value': level, 'label': level.title()} for level in Notification.LEVELS]
-        return Response({'levels': levels})
\ No newline at end of file
+        response = Response(_LEVELS_RESPONSE)
+        patch_cache_control(response, public=True, max_age=86400)
+        return response
+
+
+class UnreadRedirectView(RedirectView):
+    """
+    Permanently redirect the former ``unread/`` action to the notification
+    list filtered with ``unread_only=true``, keeping the other query parameters.
+    GET /api/notifications/unread/
+    """
+    permanent = True
+
+    def get_redirect_url(self, *args, **kwargs):
+        query = self.request.GET.copy()
+        query['unread_only'] = 'true'
+        list_path = self.request.path.rsplit('unread/', 1)[0]
+        return f'{list_path}?{query.urlencode()}'
@@ -34,6 +34,9 @@ setup(
         'swapper',
         "packaging"
     ],
+    extras_require={
+        'orjson': ['orjson'],
+    },
     test_requires=[
         'django>=3.2',
         'django-model-utils>=3.1.0',
@@ -42,6 +45,8 @@ setup(
     packages=[
         'notifications',
         'notifications.base',
+        'notifications.management',
+        'notifications.management.commands',
         'notifications.migrations',
     ],
     include_package_data=True,